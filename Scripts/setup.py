@@ -4,74 +4,89 @@ ElkGameEngine Project Setup Script
 
 This script sets up the basic directory structure and creates template files
 for a new ElkGameEngine project.
+
+Usage: setup.py [--path PATH] [--force] [--dry-run]
+
+Options:
+  -p, --path PATH  Project root path (default: current directory)
+  -f, --force      Force overwrite existing files
+  -n, --dry-run    Print the planned directories and files without touching
+                   the filesystem
+  -h, --help       Show this help message and exit
 """
 
+import io
 import os
+import posixpath
 import sys
-import argparse
 from pathlib import Path
-from typing import List, Dict
+from types import MappingProxyType, SimpleNamespace
+from typing import Dict, Final, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
-def create_directory_structure() -> Dict[str, List[str]]:
-    """Define the directory structure to create."""
+def create_directory_structure() -> Dict[str, List[Tuple[str, bool]]]:
+    """Define the directory structure to create.
+    
+    Each subdirectory is paired with a flag telling whether it gets a
+    .gitkeep file. An empty subdirectory name ("") refers to the top-level
+    directory itself.
+    """
     structure = {
         "Assets": [
-            "Models",
-            "Textures", 
-            "Audio",
-            "Scenes",
-            "Materials",
-            "Scripts"
+            ("Models", True),
+            ("Textures", True), 
+            ("Audio", True),
+            ("Scenes", True),
+            ("Materials", False),
+            ("Scripts", False)
         ],
         "Documentation": [
-            "API",
-            "Design", 
-            "UserGuide"
+            ("API", False),
+            ("Design", False), 
+            ("UserGuide", False)
         ],
         "Editor/Source": [
-            "GUI",
-            "Connection",
-            "AssetBrowser"
+            ("GUI", False),
+            ("Connection", False),
+            ("AssetBrowser", False)
         ],
-        "Editor/Resources": [],
+        "Editor/Resources": [("", True)],
         "ElkEngine/Public/ElkEngine": [
-            "Core",
-            "Renderer",
-            "Audio", 
-            "Input",
-            "Math",
-            "Platform"
+            ("Core", False),
+            ("Renderer", False),
+            ("Audio", False), 
+            ("Input", False),
+            ("Math", False),
+            ("Platform", False)
         ],
         "ElkEngine/Private": [
-            "Core",
-            "Renderer",
-            "Audio",
-            "Input", 
-            "Math",
-            "Platforms/Windows",
-            "Platforms/Linux",
-            "Platforms/macOS"
+            ("Core", False),
+            ("Renderer", False),
+            ("Audio", False),
+            ("Input", False), 
+            ("Math", False),
+            ("Platforms/Windows", False),
+            ("Platforms/Linux", False),
+            ("Platforms/macOS", False)
         ],
         "Runtime/Source": [],
         "Samples": [
-            "BasicGame",
-            "PhysicsDemo"
+            ("BasicGame", False),
+            ("PhysicsDemo", False)
         ],
         "Scripts": [],
-        "ThirdParty": [],
+        "ThirdParty": [("", True)],
         "Tools": [
-            "AssetProcessor",
-            "ShaderCompiler"
+            ("AssetProcessor", False),
+            ("ShaderCompiler", False)
         ]
     }
     return structure
 
-def create_template_files() -> Dict[str, str]:
-    """Define template files to create."""
-    templates = {}
-    
+# Template file contents, stored as bytes literals so nothing is built or
+# encoded at run time
+_TEMPLATES: Final[Mapping[str, bytes]] = MappingProxyType({
     # Engine.h template
-    templates["ElkEngine/Public/ElkEngine/Core/Engine.h"] = '''#pragma once
+    "ElkEngine/Public/ElkEngine/Core/Engine.h": b'''#pragma once
 
 #include "EngineAPI.h"
 
@@ -100,10 +115,10 @@ ENGINE_API Engine* CreateEngine();
 ENGINE_API void DestroyEngine(Engine* engine);
 
 } // namespace elk
-'''
+''',
 
     # Application.h template
-    templates["ElkEngine/Public/ElkEngine/Core/Application.h"] = '''#pragma once
+    "ElkEngine/Public/ElkEngine/Core/Application.h": b'''#pragma once
 
 namespace elk {
 
@@ -121,10 +136,10 @@ public:
 };
 
 } // namespace elk
-'''
+''',
 
     # main.cpp template
-    templates["Runtime/Source/main.cpp"] = '''#include "ElkEngine/Core/Engine.h"
+    "Runtime/Source/main.cpp": b'''#include "ElkEngine/Core/Engine.h"
 #include "GameApplication.h"
 
 int main() {
@@ -150,10 +165,10 @@ int main() {
     elk::DestroyEngine(engine);
     return 0;
 }
-'''
+''',
 
     # GameApplication.h template
-    templates["Runtime/Source/GameApplication.h"] = '''#pragma once
+    "Runtime/Source/GameApplication.h": b'''#pragma once
 
 #include "ElkEngine/Core/Application.h"
 
@@ -172,10 +187,10 @@ public:
 private:
     // Game-specific members
 };
-'''
+''',
 
     # GameApplication.cpp template
-    templates["Runtime/Source/GameApplication.cpp"] = '''#include "GameApplication.h"
+    "Runtime/Source/GameApplication.cpp": b'''#include "GameApplication.h"
 #include <iostream>
 
 bool GameApplication::Initialize() {
@@ -195,10 +210,10 @@ void GameApplication::Render() {
 void GameApplication::Shutdown() {
     std::cout << "Game shutdown!" << std::endl;
 }
-'''
+''',
 
     # Editor main.cpp template
-    templates["Editor/Source/main.cpp"] = '''#include "EditorApplication.h"
+    "Editor/Source/main.cpp": b'''#include "EditorApplication.h"
 
 int main() {
     EditorApplication editor;
@@ -212,10 +227,10 @@ int main() {
     
     return 0;
 }
-'''
+''',
 
     # EditorApplication.h template
-    templates["Editor/Source/EditorApplication.h"] = '''#pragma once
+    "Editor/Source/EditorApplication.h": b'''#pragma once
 
 class EditorApplication {
 public:
@@ -233,10 +248,10 @@ private:
     void Update();
     void Render();
 };
-'''
+''',
 
     # Tools CMakeLists.txt template
-    templates["Tools/CMakeLists.txt"] = '''# Tools/CMakeLists.txt
+    "Tools/CMakeLists.txt": b'''# Tools/CMakeLists.txt
 
 message(STATUS "Configuring Tools...")
 
@@ -251,71 +266,18 @@ if(EXISTS "${CMAKE_CURRENT_SOURCE_DIR}/ShaderCompiler")
 endif()
 
 message(STATUS "Tools configuration completed")
-'''
-
-    return templates
-
-def create_directories(base_path: Path, structure: Dict[str, List[str]]) -> None:
-    """Create directory structure."""
-    print("Creating directory structure...")
-    
-    for main_dir, subdirs in structure.items():
-        main_path = base_path / main_dir
-        main_path.mkdir(parents=True, exist_ok=True)
-        print(f"  ✓ {main_dir}/")
-        
-        for subdir in subdirs:
-            sub_path = main_path / subdir
-            sub_path.mkdir(parents=True, exist_ok=True)
-            print(f"    ✓ {main_dir}/{subdir}/")
-
-def create_files(base_path: Path, templates: Dict[str, str]) -> None:
-    """Create template files."""
-    print("\nCreating template files...")
-    
-    for file_path, content in templates.items():
-        full_path = base_path / file_path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Only create if file doesn't exist
-        if not full_path.exists():
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"  ✓ {file_path}")
-        else:
-            print(f"  ⚠ {file_path} (already exists, skipped)")
+''',
+})
 
-def create_gitkeep_files(base_path: Path, structure: Dict[str, List[str]]) -> None:
-    """Create .gitkeep files in empty directories."""
-    print("\nCreating .gitkeep files for empty directories...")
-    
-    empty_dirs = [
-        "Assets/Models",
-        "Assets/Textures", 
-        "Assets/Audio",
-        "Assets/Scenes",
-        "Editor/Resources",
-        "ThirdParty"
-    ]
-    
-    for dir_path in empty_dirs:
-        gitkeep_path = base_path / dir_path / ".gitkeep"
-        gitkeep_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        if not gitkeep_path.exists():
-            gitkeep_path.touch()
-            print(f"  ✓ {dir_path}/.gitkeep")
+def create_template_files() -> Mapping[str, bytes]:
+    """Define template files to create."""
+    return _TEMPLATES
 
-def setup_cmake_module_dirs(base_path: Path) -> None:
-    """Create CMakeLists.txt files for modules that need them."""
-    print("\nSetting up module CMakeLists.txt files...")
-    
+# CMakeLists.txt files for modules that need them, stored as bytes literals
+# like the templates above
+_MODULE_FILES: Final[Mapping[str, bytes]] = MappingProxyType({
     # Samples CMakeLists.txt
-    samples_cmake = base_path / "Samples" / "CMakeLists.txt"
-    if not samples_cmake.exists():
-        samples_cmake.parent.mkdir(parents=True, exist_ok=True)
-        with open(samples_cmake, 'w') as f:
-            f.write('''# Samples/CMakeLists.txt
+    "Samples/CMakeLists.txt": b'''# Samples/CMakeLists.txt
 
 message(STATUS "Configuring Samples...")
 
@@ -324,36 +286,306 @@ message(STATUS "Configuring Samples...")
 # add_subdirectory(PhysicsDemo)
 
 message(STATUS "Samples configuration completed")
-''')
-        print(f"  ✓ Samples/CMakeLists.txt")
+''',
+})
+
+def create_module_files() -> Mapping[str, bytes]:
+    """Define CMakeLists.txt files for modules that need them."""
+    return _MODULE_FILES
+
+# Definitions are built once at import time; a run only reads these frozen
+# constants.
+_STRUCTURE: Final[Mapping[str, Tuple[Tuple[str, bool], ...]]] = MappingProxyType({
+    main_dir: tuple(subdirs) for main_dir, subdirs in create_directory_structure().items()
+})
+# Every file the setup writes, in declaration order
+_ALL_WRITES: Final[Tuple[Tuple[str, bytes], ...]] = tuple({**create_template_files(), **create_module_files()}.items())
+
+# Marker written to the project root after a successful run
+_MARKER_NAME: Final[str] = ".elk_setup_v1"
+
+def _setup_signature() -> str:
+    """Hash of everything the setup creates, used to detect an up-to-date project."""
+    # Imported here so --help never pays for it
+    import hashlib
+    
+    definition = (
+        repr(_STRUCTURE)
+        + repr(_ALL_WRITES)
+    )
+    return hashlib.blake2b(definition.encode('utf-8'), digest_size=16).hexdigest()
+
+def _join_subdir(main_dir: str, subdir: str) -> str:
+    """Join a structure entry into a relative '/'-separated path."""
+    return f"{main_dir}/{subdir}" if subdir else main_dir
+
+def _collect_dirs(structure: Mapping[str, Tuple[Tuple[str, bool], ...]], files: Iterable[str]) -> List[Tuple[str, bool]]:
+    """Collect every directory needed by the setup once, parents before children.
+    
+    Returns (relative '/'-separated path, needs .gitkeep) pairs in
+    lexicographic order, which keeps siblings together and always places a
+    parent before its children.
+    """
+    gitkeep_dirs = set()
+    dirs = set()
+    for main_dir, subdirs in structure.items():
+        dirs.add(main_dir)
+        for subdir, gitkeep in subdirs:
+            dir_path = _join_subdir(main_dir, subdir)
+            dirs.add(dir_path)
+            if gitkeep:
+                gitkeep_dirs.add(dir_path)
+    dirs.update(posixpath.dirname(file_path) for file_path in files)
+    dirs.discard("")
+    
+    # Intermediate parents (e.g. "Editor" for "Editor/Source") are created
+    # explicitly so that no mkdir below needs to create parents
+    for dir_path in list(dirs):
+        parent = posixpath.dirname(dir_path)
+        while parent:
+            dirs.add(parent)
+            parent = posixpath.dirname(parent)
+    
+    return [(d, d in gitkeep_dirs) for d in sorted(dirs)]
 
-def main():
-    parser = argparse.ArgumentParser(description='Setup ElkGameEngine project structure')
-    parser.add_argument('--path', '-p', type=str, default='.', 
-                       help='Project root path (default: current directory)')
-    parser.add_argument('--force', '-f', action='store_true',
-                       help='Force overwrite existing files')
+def _existing_dirs(base_str: str, wanted: Set[str]) -> Set[str]:
+    """Return which of the wanted relative directories already exist.
     
-    args = parser.parse_args()
+    Uses os.scandir, whose entries carry the file type, so no per-directory
+    stat is needed. Only directories on the way to a wanted path are visited.
+    The project root itself is reported as "" when it exists.
+    """
+    existing = set()
+    
+    def scan(dir_str: str, rel_path: str) -> None:
+        try:
+            it = os.scandir(dir_str)
+        except FileNotFoundError:
+            return
+        existing.add(rel_path)
+        with it:
+            for entry in it:
+                child = f"{rel_path}/{entry.name}" if rel_path else entry.name
+                if child in wanted and entry.is_dir():
+                    scan(entry.path, child)
+    
+    scan(base_str, "")
+    return existing
+
+def _open_dir_fd(dir_str: str) -> Optional[int]:
+    """Open a directory for use as dir_fd, or return None if unsupported."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return None
+    if os.open not in os.supports_dir_fd or os.mkdir not in os.supports_dir_fd:
+        return None
+    return os.open(dir_str, os.O_RDONLY | os.O_DIRECTORY)
+
+class _Logger:
+    """Buffer progress output and write it to stdout in a single call on exit."""
+    
+    def __enter__(self) -> "_Logger":
+        self._buffer = io.StringIO()
+        return self
+    
+    def write(self, text: str) -> None:
+        self._buffer.write(text)
+    
+    def __exit__(self, *exc_info) -> None:
+        sys.stdout.write(self._buffer.getvalue())
+        sys.stdout.flush()
+
+def create_directories(base_str: str, structure: Mapping[str, Tuple[Tuple[str, bool], ...]], dirs: List[Tuple[str, bool]], dry: bool = False) -> None:
+    """Create directory structure and .gitkeep files for empty directories.
+    
+    With dry set, only the planned operations are logged.
+    """
+    with _Logger() as log:
+        log.write("Creating directory structure...\n")
+        
+        if dry:
+            for dir_path, gitkeep in dirs:
+                log.write(f"  mkdir {dir_path}/\n")
+                if gitkeep:
+                    log.write(f"  create {dir_path}/.gitkeep\n")
+            return
+        
+        existing = _existing_dirs(base_str, {dir_path for dir_path, _ in dirs})
+        
+        # Every directory is issued at most one mkdir, parents first, and only
+        # if the scan did not find it; the root is the only one that may need
+        # its own parents created
+        if "" not in existing:
+            os.makedirs(base_str, exist_ok=True)
+        
+        # Where supported, resolve paths relative to an fd of the project root
+        # (mkdirat/openat) instead of walking the absolute path every time
+        base_fd = _open_dir_fd(base_str)
+        created_gitkeeps = set()
+        try:
+            for dir_path, gitkeep in dirs:
+                target = dir_path if base_fd is not None else os.path.join(base_str, dir_path)
+                if dir_path not in existing:
+                    try:
+                        os.mkdir(target, dir_fd=base_fd)
+                    except FileExistsError:
+                        pass
+                if gitkeep:
+                    gitkeep_path = os.path.join(target, ".gitkeep")
+                    try:
+                        fd = os.open(gitkeep_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644, dir_fd=base_fd)
+                    except FileExistsError:
+                        pass
+                    else:
+                        os.close(fd)
+                        created_gitkeeps.add(dir_path)
+        finally:
+            if base_fd is not None:
+                os.close(base_fd)
+        
+        for main_dir, subdirs in structure.items():
+            log.write(f"  ✓ {main_dir}/\n")
+            for subdir, _ in subdirs:
+                dir_path = _join_subdir(main_dir, subdir)
+                if subdir:
+                    log.write(f"    ✓ {dir_path}/\n")
+                if dir_path in created_gitkeeps:
+                    log.write(f"    ✓ {dir_path}/.gitkeep\n")
+
+def _write_file(file_path: str, content: bytes, flags: int, dir_fd: Optional[int]) -> bool:
+    """Write a single file with the given open flags. Returns True if written."""
+    # With O_EXCL the existence check is fused with the open
+    try:
+        fd = os.open(file_path, flags, 0o644, dir_fd=dir_fd)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    return True
+
+def _write_files_parallel(base_str: str, files: Iterable[Tuple[str, bytes]], force: bool = False) -> Dict[str, bool]:
+    """Write files concurrently to overlap per-file filesystem latency.
+    
+    Existing files are skipped unless force is set, in which case they are
+    truncated and overwritten. Files are submitted in path order so files
+    sharing a parent directory are written together.
+    """
+    # Imported here: concurrent.futures pulls in logging, re and traceback,
+    # which would slow down every run that never writes a file
+    from concurrent.futures import ThreadPoolExecutor
+    
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if force else os.O_EXCL)
+    base_fd = _open_dir_fd(base_str)
+    try:
+        # Worker threads are only started as tasks are submitted
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            futures = {
+                executor.submit(
+                    _write_file,
+                    file_path if base_fd is not None else os.path.join(base_str, file_path),
+                    content,
+                    flags,
+                    base_fd,
+                ): file_path
+                for file_path, content in sorted(files, key=lambda item: item[0])
+            }
+    finally:
+        if base_fd is not None:
+            os.close(base_fd)
+    
+    return {file_path: future.result() for future, file_path in futures.items()}
+
+def create_all(base_str: str, writes: Sequence[Tuple[str, bytes]], force: bool = False, dry: bool = False) -> None:
+    """Create template and module files in a single pass.
+    
+    Progress is logged in the order of writes. With dry set, only the
+    planned writes are logged.
+    """
+    with _Logger() as log:
+        log.write("\nCreating template files...\n")
+        
+        if dry:
+            for file_path, content in writes:
+                log.write(f"  write {file_path} ({len(content)} bytes)\n")
+            return
+        
+        results = _write_files_parallel(base_str, writes, force)
+        for file_path, _ in writes:
+            if results[file_path]:
+                log.write(f"  ✓ {file_path}\n")
+            else:
+                log.write(f"  ⚠ {file_path} (already exists, skipped)\n")
+
+def main():
+    # Hand-rolled parsing: importing argparse costs more than the whole setup
+    path = '.'
+    force = False
+    dry_run = False
+    it = iter(sys.argv[1:])
+    for arg in it:
+        if arg in ('-p', '--path'):
+            path = next(it, None)
+            if path is None:
+                sys.exit(f"error: {arg} requires a value")
+        elif arg.startswith('--path='):
+            path = arg[len('--path='):]
+        elif arg in ('-f', '--force'):
+            force = True
+        elif arg in ('-n', '--dry-run'):
+            dry_run = True
+        elif arg in ('-h', '--help'):
+            print(__doc__)
+            return
+        else:
+            sys.exit(f"error: unrecognized argument: {arg}")
+    args = SimpleNamespace(path=path, force=force, dry_run=dry_run)
     
     project_path = Path(args.path).resolve()
+    # Helpers work on the plain string; Path objects are only used for display
+    base_str = os.fspath(project_path)
     
     print(f"Setting up ElkGameEngine project at: {project_path}")
+    if args.dry_run:
+        print("(dry run: nothing will be written)")
     print("=" * 60)
     
-    # Create directory structure
-    structure = create_directory_structure()
-    create_directories(project_path, structure)
+    # Skip all filesystem work if the same definitions were already applied
+    marker_path = os.path.join(base_str, _MARKER_NAME)
+    # A dry run never reads or writes the marker, so it skips the hash too
+    signature = None if args.dry_run else _setup_signature()
+    if not args.force and not args.dry_run:
+        # Any failure to read the marker (missing, or the path is not a
+        # directory) just means the full setup runs
+        try:
+            with open(marker_path, encoding='utf-8') as f:
+                up_to_date = f.read() == signature
+        except OSError:
+            up_to_date = False
+        if up_to_date:
+            print("Project is already up to date.")
+            print(f"Delete {_MARKER_NAME} to recreate missing files, "
+                  "or use --force to overwrite existing files.")
+            return
+    
+    if not args.dry_run and os.path.exists(base_str) and not os.path.isdir(base_str):
+        sys.exit(f"error: {project_path} is not a directory")
+    
+    # Create every required directory (and .gitkeep) once up front
+    dirs = _collect_dirs(_STRUCTURE, (file_path for file_path, _ in _ALL_WRITES))
+    create_directories(base_str, _STRUCTURE, dirs, dry=args.dry_run)
     
-    # Create template files
-    templates = create_template_files()
-    create_files(project_path, templates)
+    # Create template and module files in one pass
+    create_all(base_str, _ALL_WRITES, force=args.force, dry=args.dry_run)
     
-    # Create .gitkeep files
-    create_gitkeep_files(project_path, structure)
+    if args.dry_run:
+        gitkeep_count = sum(1 for _, gitkeep in dirs if gitkeep)
+        total_bytes = sum(len(content) for _, content in _ALL_WRITES)
+        print("\n" + "=" * 60)
+        print(f"Dry run: {len(dirs)} directories, {gitkeep_count} .gitkeep files, "
+              f"{len(_ALL_WRITES)} files ({total_bytes} bytes) planned")
+        return
     
-    # Setup additional CMake files
-    setup_cmake_module_dirs(project_path)
+    with open(marker_path, 'w', encoding='utf-8') as f:
+        f.write(signature)
     
     print("\n" + "=" * 60)
     print("✅ Project setup completed successfully!")